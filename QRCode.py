@@ -1,316 +1,291 @@
-from dataTables import alphanumericValues as aVs
 from dataTables import errorCorretionLevels as eCLs
-from dataTables import characterCapacities as cCs
-from dataTables import modeIndicators as mIs
-from dataTables import characterCountIndicators as cCIs
 from dataTables import errorCorrectionCodeWordsBlockInformation as eCCWBI
-from dataTables import requiredRemainderBits as rRBs
-from dataTables import alignmentPatternLocations as aPLs
-from dataTables import formatInformationString as fISs
-from dataTables import versionInformationStrings as vISs
-
-from more_itertools import roundrobin
-from tkinter import filedialog
-from random import randint
-from math import floor
+from dataTables import modeIndicators as mIs
+from galoisField import reedSolomonEncode
+from codewordBlocks import blockLayout, interleavingOrder
+from bitBuffer import BitBuffer
+from segmentation import characterCountIndicatorIndex, optimalSegments, segmentsLength, encodeSegments
+from versionSelection import policies, selectVersion
+from matrixTemplates import functionPatternTemplate, maskPatterns
+from matrixTemplates import formatInformationCoordinates, versionInformationCoordinates
+from matrixTemplates import formatInformationBits, versionInformationBits
+from maskPenalty import penaltyScores
+from imageFormats import encodeImage
+from instrumentation import hooks, notify
+
+from time import perf_counter
+import os
 import numpy as np
-import cv2
 
 class QRCode:
-  def __init__(self, text):
+  def __init__(self, text, mask=None, structuredAppend=None, errorCorretionLevel=None, version=None, maxVersion=40,
+    policy='prefer-smaller'):
+    """ structuredAppend is (position, total, parity) when the text is part of a message split over several symbols.
+    errorCorretionLevel is the lowest level accepted, version pins the version and policy is prefer-smaller or
+    prefer-stronger, see versionSelection.selectVersion """
+    if mask is not None and mask not in range(8):
+      raise ValueError('mask must be a number from 0 to 7')
+    if errorCorretionLevel is not None and errorCorretionLevel not in eCLs:
+      raise ValueError('error correction level must be L, M, Q or H')
+    if version is not None and version not in range(1, 41) or maxVersion not in range(1, 41):
+      raise ValueError('version must be a number from 1 to 40')
+    if policy not in policies:
+      raise ValueError('policy must be one of ' + ', '.join(policies))
+    if structuredAppend is not None and not 0 <= structuredAppend[0] < structuredAppend[1] <= 16:
+      raise ValueError('structured append position must be less than the total of at most 16 symbols')
+    if structuredAppend is not None and not 0 <= structuredAppend[2] <= 255:
+      raise ValueError('structured append parity must be a number from 0 to 255')
     self.text = text
+    self.structuredAppend = structuredAppend
     self.errorCorretionLevel = None
     self.encodingMode = None
     self.version = None
-    self.__bitString = None
-    self.__logAntilog = []
-    self.__generatorPolynomial = []
+    self.__segments = {}
+    self.__dataCodewords = None
     self.__messagePolynomial = []
     self.__errorCorrectionCodewords = []
     self.__finalMessage = []
     self.size = None
-    self.__matrix = []
-    self.__mask = None
+    self.__matrix = None
+    self.__functionPatterns = None
+    self.__fixedMask = mask
+    self.mask = None
+    self.__selection = (errorCorretionLevel, version, maxVersion, policy)
 
-  """ Step 1: Data Analysis ✔️ """ 
+  """ Step 1: Data Analysis ✔️ """
   def __dataAnalysis(self):
-    if self.text.isnumeric():
-      self.encodingMode = 'numeric'
-    elif all(character in aVs for character in self.text):
-      self.encodingMode = 'alphanumeric'
-    else:
-      self.encodingMode = 'byte'
+    ## The text is split into numeric, alphanumeric, byte and kanji segments with the fewest bits, which depends on
+    ## the sizes of the character count indicators, so the segments of versions 10 to 40 are only found if needed
+    self.__segments = {0: optimalSegments(self.text, 1)}
+
+  def __segmentsFor(self, version):
+    index = characterCountIndicatorIndex(version)
+    if index not in self.__segments:
+      self.__segments[index] = optimalSegments(self.text, version)
+    return self.__segments[index]
 
   """ Step 2: Data Encoding ✔️ """
   def __dataEncoding(self):
     # Step 2.1: Choose the Error Correction Level ✔️
     # Step 2.2: Determine the Smallest Version for the Data ✔️
-    ## I chose to prioritize the version over the error correction level
-    for i in range(40):
-      for j in range(3, -1, -1):
-        if cCs[self.encodingMode][j][i] >= len(self.text):
-          self.version = i + 1
-          self.errorCorretionLevel = eCLs[j]
-          break
-      if self.version != None:
-        break
+    ## By default the version is prioritized over the error correction level, the capacities are searched by bisection
+    headerBits = 20 if self.structuredAppend else 0
+    selection = selectVersion(
+      lambda version: segmentsLength(self.__segmentsFor(version), version) + headerBits, *self.__selection
+    )
+    if selection is None:
+      errorCorretionLevel, version, maxVersion, policy = self.__selection
+      limits = {None: '', 'L': '', 'M': ' at level M or higher', 'Q': ' at level Q or higher', 'H': ' at level H'}[
+        errorCorretionLevel
+      ]
+      if version is not None:
+        raise ValueError('text is too long to fit in a version %d qr code%s' % (version, limits))
+      if maxVersion < 40:
+        limits = ' of version %d or lower' % maxVersion + limits
+      raise ValueError(
+        'text is too long to fit in a qr code%s, structuredAppend.py can split it over several symbols' % limits
+      )
+    self.version, self.errorCorretionLevel = selection
 
-    # Step 2.3: Add the Mode Indicator ✔️
-    modeIndicator = mIs[self.encodingMode]
-    self.__bitString = modeIndicator
+    segments = self.__segmentsFor(self.version)
+    dataModes = set(mode for mode, text in segments if mode != 'eci')
+    self.encodingMode = dataModes.pop() if len(dataModes) == 1 else 'mixed' if dataModes else None
 
+    # Step 2.3: Add the Mode Indicator ✔️
     # Step 2.4: Add the Character Count Indicator ✔️
-    if self.version <= 9:
-      characterCountIndicatorSize = cCIs[self.encodingMode][0]
-    elif 10 <= self.version <= 26:
-      characterCountIndicatorSize = cCIs[self.encodingMode][1]
-    else:
-      characterCountIndicatorSize = cCIs[self.encodingMode][2]
-    characterCountIndicator = '{:0{size}b}'.format(len(self.text), size = characterCountIndicatorSize)
-    self.__bitString += characterCountIndicator
-
     # Step 2.5: Encode Using the Selected Mode ✔️
-    groups = []
-    if self.encodingMode == 'numeric':
-      for digits in range(0, len(self.text), 3):
-        groups.append(self.text[digits:digits + 3])
-      binaryBits = (4, 7, 10)
-      encodedData = ''.join('{:0{size}b}'.format(int(x), size = binaryBits[len(str(x))-1]) for x in groups)
-    elif self.encodingMode == 'alphanumeric':
-      pairs = []
-      for digits in range(0, len(self.text), 2):
-         pairs.append(self.text[digits:digits + 2])
-      groups = [(45*aVs.index(x[0])) + aVs.index(x[1]) if len(x) == 2 else aVs.index(x[0]) for x in pairs]
-      binaryBits = (6, 11)
-      encodedData = ''.join('{:0{size}b}'.format(x, size = binaryBits[len(str(y))-1]) for x, y in zip(groups, pairs))
-    else:
-      groups = [ord(x) for x in self.text]
-      encodedData = ''.join('{:08b}'.format(x) for x in groups)
-    self.__bitString += encodedData
+    ## Every segment has its own mode and character count indicators
+    self.__dataCodewords = BitBuffer()
+    if self.structuredAppend:
+      position, total, parity = self.structuredAppend
+      self.__dataCodewords.append(int(mIs['structuredAppend'], 2), len(mIs['structuredAppend']))
+      self.__dataCodewords.append(position, 4)
+      self.__dataCodewords.append(total - 1, 4)
+      self.__dataCodewords.append(parity, 8)
+    encodeSegments(segments, self.version, self.__dataCodewords)
 
     # Step 2.6: Break Up into 8-bit Codewords and Add Pad Bytes if Necessary ✔️
     bitsRequired = eCCWBI[self.errorCorretionLevel][self.version - 1][0]*8
-    for i in range(4):
-      self.__bitString += '0' if len(self.__bitString) < bitsRequired else ''
-    while len(self.__bitString)%8 != 0:
-      self.__bitString += '0'
-    padBytes = int((bitsRequired - len(self.__bitString))/8)
-    for i in range(padBytes):
-      self.__bitString += '11101100' if i%2 == 0 else '00010001'
+    self.__dataCodewords.append(0, min(4, bitsRequired - len(self.__dataCodewords)))
+    self.__dataCodewords = self.__dataCodewords.toBytes()
+    padBytes = bitsRequired//8 - len(self.__dataCodewords)
+    self.__dataCodewords += (b'\xec\x11'*(padBytes//2 + 1))[:padBytes]
 
   """ Step 3: Error Correction Coding ✔️ """
-  def __greaterThanOrEqualTo256(self, array):
-    return [x%255 if x >= 256 else x for x in array]
-
-  def __alphaNotation2IntegerNotation(self, alphaNotation):
-    return [self.__logAntilog[x] for x in alphaNotation]
-
-  def __integerNotation2AlphaNotation(self, integerNotation):
-    return [self.__logAntilog.index(x) for x in integerNotation]
-
   def __errorCorrectionCoding(self):
     # Step 3.1: Break Data Codewords into Blocks if Necessary ✔️
-    ## I did the step above in step 4.1
+    ## Blocks of group 1 are one codeword shorter, they start with a zero that does not change the remainder in step 3.9
+    blocksInformation = eCCWBI[self.errorCorretionLevel][self.version-1]
+    self.__messagePolynomial = np.append(np.frombuffer(self.__dataCodewords, dtype=np.uint8), np.uint8(0))
+    self.__messagePolynomial = self.__messagePolynomial[blockLayout(self.version, self.errorCorretionLevel)]
+
     # Step 3.2: Understand Polynomial Long Division ✔️
     # Step 3.3: Understand The Galois Field ✔️
     # Step 3.4: Understand Galois Field Arithmetic ✔️
-
     # Step 3.5: Generate Powers of 2 Using Byte-Wise Modulo 100011101 ✔️
-    self.__logAntilog = [1]
-    while len(self.__logAntilog) != 256:
-      i = self.__logAntilog[-1]*2
-      self.__logAntilog.append(i if i < 256 else i^285)
-
     # Step 3.6: Understand Multiplication with Logs and Antilogs ✔️
-
     # Step 3.7: Understanding The Generator Polynomial ✔️
-    g = [1, 0]
-    self.__generatorPolynomial = [1, 25, 0]
-    for steps in range(eCCWBI[self.errorCorretionLevel][self.version - 1][1] - 2):
-      g[0] += 1 
-      auxGeneratorPolynomial = []
-      for i in range(len(self.__generatorPolynomial)):
-        auxGeneratorPolynomial.extend([self.__generatorPolynomial[i] + g[0], self.__generatorPolynomial[i] + g[1]])
-      auxGeneratorPolynomial = self.__greaterThanOrEqualTo256(auxGeneratorPolynomial)
-      auxGeneratorPolynomial = self.__alphaNotation2IntegerNotation(auxGeneratorPolynomial)
-      self.__generatorPolynomial = [auxGeneratorPolynomial[0]]
-      for i in range(1, len(auxGeneratorPolynomial) - 1, 2):
-        self.__generatorPolynomial.append(auxGeneratorPolynomial[i]^auxGeneratorPolynomial[i+1])
-      self.__generatorPolynomial.append(auxGeneratorPolynomial[-1])
-      self.__generatorPolynomial = self.__integerNotation2AlphaNotation(self.__generatorPolynomial)
-
-    self.__messagePolynomial = [int(self.__bitString[i:i+8], 2) for i in range(0, len(self.__bitString), 8)]
-
-  def __generateErrorCorrectionCodewords(self, block):
+    ## The tables and the generator polynomials are built once in galoisField.py
+
     # Step 3.8: Generating Error Correction Codewords ✔️
     # Step 3.9: Divide the Message Polynomial by the Generator Polynomial ✔️
-    for steps in range(len(block)):
-      generatorPolynomialMultiplied = self.__generatorPolynomial.copy()
-      leadTerm = self.__integerNotation2AlphaNotation([block[-1]]) if block[-1]!= 0 else [0]
-      generatorPolynomialMultiplied = [x + leadTerm[-1] for x in generatorPolynomialMultiplied]
-      generatorPolynomialMultiplied = self.__greaterThanOrEqualTo256(generatorPolynomialMultiplied)
-      generatorPolynomialMultiplied = self.__alphaNotation2IntegerNotation(generatorPolynomialMultiplied)
-      
-      a, b = generatorPolynomialMultiplied, block
-      if len(self.__generatorPolynomial) > len(block):
-        a, b = b, a
-      a = [0]*abs(len(self.__generatorPolynomial) - len(block)) + a
-      block = [x^y if y!=0 else x for x, y in zip(b, a)]
-      block.pop()
-    return block[::-1]
+    self.__errorCorrectionCodewords = reedSolomonEncode(self.__messagePolynomial, blocksInformation[1])
 
   """ Step 4: Structure Final Message ✔️ """
   def __structureFinalMessage(self):
     # Step 4.1: Determine How Many Blocks and Error Correction Codewords are Required ✔️
-    auxMessagePolynomial = []
-    for i in range(2, 5, 2):
-      blockSize = eCCWBI[self.errorCorretionLevel][self.version-1][i+1]
-      for j in range(eCCWBI[self.errorCorretionLevel][self.version-1][i]):
-        auxMessagePolynomial.append(self.__messagePolynomial[blockSize*j:blockSize*(j+1)])
-        self.__errorCorrectionCodewords.append(self.__generateErrorCorrectionCodewords(auxMessagePolynomial[-1][::-1]))
-      group2 = eCCWBI[self.errorCorretionLevel][self.version-1][2] * eCCWBI[self.errorCorretionLevel][self.version-1][3]
-      self.__messagePolynomial = self.__messagePolynomial[group2:]
-    self.__messagePolynomial = auxMessagePolynomial.copy()
+    ## I did the step above in step 3.1
 
     # Step 4.2: Intervale the Blocks ✔️
-    self.__finalMessage = list(roundrobin(*self.__messagePolynomial)) + list(roundrobin(*self.__errorCorrectionCodewords))
+    self.__finalMessage = np.frombuffer(self.__dataCodewords, dtype=np.uint8)
+    self.__finalMessage = np.concatenate([self.__finalMessage, self.__errorCorrectionCodewords.ravel()])
+    self.__finalMessage = self.__finalMessage[interleavingOrder(self.version, self.errorCorretionLevel)]
 
     # Step 4.3: Convert to Binary ✔️
-    self.__finalMessage = ''.join('{:08b}'.format(x) for x in self.__finalMessage)
-
     # Step 4.4: Add Remainder Bits if Necessary ✔️
-    self.__finalMessage += '0'*rRBs[self.version - 1]
+    ## The codewords are only converted to bits in step 5.6, the remainder bits are the data modules left over
 
   """ Step 5: Module Placement in Matrix ✔️ """
   def __modulePlacement(self):
     self.size = (self.version - 1)*4 + 21
-    self.__matrix = np.zeros((self.size, self.size))
 
     # Step 5.1: Add the Finder Patterns ✔️
-    cv2.rectangle(self.__matrix, pt1=(0,0), pt2=(6,6), color=1, thickness=-1)
-    cv2.rectangle(self.__matrix, pt1=(1,1), pt2=(5,5), color=254, thickness=1)
-    cv2.rectangle(self.__matrix, pt1=(self.size-7,0), pt2=(self.size-1,6), color=1, thickness=-1)
-    cv2.rectangle(self.__matrix, pt1=(self.size-6,1), pt2=(self.size-2,5), color=254, thickness=1)
-    cv2.rectangle(self.__matrix, pt1=(0,self.size-7), pt2=(6,self.size-1), color=1, thickness=-1)
-    cv2.rectangle(self.__matrix, pt1=(1,self.size-6), pt2=(5,self.size-2), color=254, thickness=1)
-
     # Step 5.2: Add the Separators ✔️
-    cv2.rectangle(self.__matrix, pt1=(-1,-1), pt2=(7,7), color=254, thickness=1)
-    cv2.rectangle(self.__matrix, pt1=(self.size-8,-1), pt2=(self.size,7), color=254, thickness=1)
-    cv2.rectangle(self.__matrix, pt1=(-1,self.size-8), pt2=(7,self.size), color=254, thickness=1)
-
     # Step 5.3: Add the Alignment Patterns ✔️
-    alignmentPatternLocation = aPLs[self.version-1]
-    for i in alignmentPatternLocation:
-      for j in alignmentPatternLocation:
-        if self.__matrix[j-1,i-1] != 254:
-          cv2.rectangle(self.__matrix, pt1=(i-2,j-2), pt2=(i+2,j+2), color=1, thickness=-1)
-          cv2.rectangle(self.__matrix, pt1=(i-1,j-1), pt2=(i+1,j+1), color=254, thickness=1)
-    
     # Step 5.4: Add the Timing Patterns ✔️
-    self.__matrix[8:self.size-8:2,6] = 1
-    self.__matrix[9:self.size-9:2,6] = 254
-    self.__matrix[6,8:self.size-8:2] = 1
-    self.__matrix[6,9:self.size-9:2] = 254
-
     # Step 5.5: Add the Dark Module and Reserved Areas ✔️
-    self.__matrix[4*self.version+9,8] = 1
-
-    self.__matrix[8,0:9] = 1
-    self.__matrix[8,self.size-8:self.size] = 1
-    self.__matrix[0:8,8] = 1
-    self.__matrix[self.size-8:self.size,8] = 1
-
-    if self.version >= 7:
-      cv2.rectangle(self.__matrix, pt1=(self.size-11,0), pt2=(self.size-9,5), color=1, thickness=-1)
-      cv2.rectangle(self.__matrix, pt1=(0,self.size-11), pt2=(5,self.size-9), color=1, thickness=-1)
+    ## The function patterns of each version are drawn once in matrixTemplates.py
+    template, self.__functionPatterns, rows, columns = functionPatternTemplate(self.version)
+    self.__matrix = template.copy()
 
     # Step 5.6: Place the Data Bits ✔️
-    k = 0
-    for i in range(self.size-1,0,-4):
-      if i == 4:
-        i -= 1
-      for j in range(self.size-1,-1,-1):
-        if self.__matrix[j,i] == 0:
-          self.__matrix[j,i] = 0 if self.__finalMessage[k] == '1' else 255
-          k += 1
-        if self.__matrix[j,i-1] == 0:
-          self.__matrix[j,i-1] = 0 if self.__finalMessage[k] == '1' else 255
-          k += 1
-      if i == 8:
-        i -= 1
-      for j in range(0,self.size):
-        if self.__matrix[j,i-2] == 0:
-          self.__matrix[j,i-2] = 0 if self.__finalMessage[k] == '1' else 255
-          k += 1
-        if self.__matrix[j,i-3] == 0:
-          self.__matrix[j,i-3] = 0 if self.__finalMessage[k] == '1' else 255
-          k += 1
+    self.__matrix[rows[:len(self.__finalMessage)*8], columns[:len(self.__finalMessage)*8]] = np.unpackbits(self.__finalMessage)
 
   """ Step 6: Data Masking ✔️ """
   def __dataMasking(self):
-    self.__mask = randint(0,7)
-    for i in range(self.size):
-      for j in range(self.size):
-        formulas = [
-          (i+j)%2, i%2, j%3, (i+j)%3, (floor(i/2) + floor(j/3))%2, ((i*j)%2) + ((i*j)%3), (((i*j)%2) + ((i*j)%3))%2,
-          (((i+j)%2) + ((i*j)%3))%2
-        ]
-        if formulas[self.__mask] == 0 and (self.__matrix[i,j] == 255 or self.__matrix[i,j] == 0):
-          self.__matrix[i,j] = 255 if self.__matrix[i,j] == 0 else 0
+    maskPattern = maskPatterns(self.version)
+
+    # Step 6.1: Determine the Best Mask ✔️
+    ## All 8 masks are evaluated at once with the format and version information in place
+    if self.__fixedMask is None:
+      candidates = self.__matrix.astype(bool) ^ maskPattern
+      formatRows, formatColumns = formatInformationCoordinates(self.version)
+      candidates[:, formatRows, formatColumns] = [formatInformationBits(self.errorCorretionLevel, mask) for mask in range(8)]
+      if self.version >= 7:
+        versionRows, versionColumns = versionInformationCoordinates(self.version)
+        candidates[:, versionRows, versionColumns] = versionInformationBits(self.version)
+      self.mask = int(np.argmin(penaltyScores(candidates)))
+    else:
+      self.mask = self.__fixedMask
+
+    # Step 6.2: Apply the Mask ✔️
+    self.__matrix ^= maskPattern[self.mask]
 
   """ Step 7: Format and Version Information ✔️ """
   def __formatVersionInformation(self):
-    formatString = [x^1 for x in list(map(int, list(fISs[self.errorCorretionLevel][self.__mask])))]
-    formatString = np.array(formatString)*255
-    self.__matrix[np.ix_([8], [0,1,2,3,4,5,7,8])] = formatString[0:8]
-    self.__matrix[8, self.size-8:] = formatString[7:]
-    self.__matrix[0:6,8] = formatString[-1:-7:-1]
-    self.__matrix[7,8] = formatString[-7]
-    self.__matrix[self.size-7:,8] = formatString[-9::-1]
+    formatRows, formatColumns = formatInformationCoordinates(self.version)
+    self.__matrix[formatRows, formatColumns] = formatInformationBits(self.errorCorretionLevel, self.mask)
 
     if self.version >= 7:
-      versionString = [x^1 for x in list(map(int, list(reversed(vISs[self.version-7]))))]
-      versionString = np.array(versionString)*255
-      self.__matrix[self.size-11,:6] = versionString[::3]
-      self.__matrix[self.size-10,:6] = versionString[1::3]
-      self.__matrix[self.size-9,:6] = versionString[2::3]
-      self.__matrix[:6,self.size-11] = versionString[::3]
-      self.__matrix[:6,self.size-10] = versionString[1::3]
-      self.__matrix[:6,self.size-9] = versionString[2::3]
-
-    self.__matrix = np.pad(self.__matrix, 4, constant_values=255)
-      
+      versionRows, versionColumns = versionInformationCoordinates(self.version)
+      self.__matrix[versionRows, versionColumns] = versionInformationBits(self.version)
+
+  def stages(self):
+    """ The steps of create in order, as (name, method) pairs """
+    return (
+      ('dataAnalysis', self.__dataAnalysis),
+      ('dataEncoding', self.__dataEncoding),
+      ('errorCorrectionCoding', self.__errorCorrectionCoding),
+      ('structureFinalMessage', self.__structureFinalMessage),
+      ('modulePlacement', self.__modulePlacement),
+      ('dataMasking', self.__dataMasking),
+      ('formatVersionInformation', self.__formatVersionInformation)
+    )
+
   def create(self):
-    self.__dataAnalysis()
-    self.__dataEncoding()
-    self.__errorCorrectionCoding()
-    self.__structureFinalMessage()
-    self.__modulePlacement()
-    self.__dataMasking()
-    self.__formatVersionInformation()
+    if not hooks:
+      for name, stage in self.stages():
+        stage()
+      return
+
+    stageTimes = {}
+    for name, stage in self.stages():
+      start = perf_counter()
+      stage()
+      stageTimes[name] = perf_counter() - start
+    blocksInformation = eCCWBI[self.errorCorretionLevel][self.version-1]
+    notify({
+      'event': 'create', 'stages': stageTimes, 'seconds': sum(stageTimes.values()), 'version': self.version,
+      'errorCorretionLevel': self.errorCorretionLevel, 'encodingMode': self.encodingMode, 'mask': self.mask,
+      'blocks': blocksInformation[2] + blocksInformation[4]
+    })
+
+  @property
+  def matrix(self):
+    """ Modules of the QR code without the quiet zone, 1 is a dark module and 0 a light one """
+    return self.__matrix
+
+  @property
+  def functionPatterns(self):
+    """ True for the modules of the function patterns and the format and version information """
+    return self.__functionPatterns
+
+  def packedMatrix(self):
+    """ Matrix packed 8 modules per byte, row by row """
+    return np.packbits(self.__matrix)
+
+  @staticmethod
+  def unpackMatrix(packed):
+    """ Matrix from the result of packedMatrix, the size is the only one that fits the number of bytes """
+    packed = np.frombuffer(packed, dtype=np.uint8)
+    for version in range(1, 41):
+      size = (version - 1)*4 + 21
+      if (size*size + 7)//8 == len(packed):
+        return np.unpackbits(packed, count=size*size).reshape(size, size)
+    raise ValueError('packed matrix does not match the size of any version')
+
+  def __image(self):
+    return np.pad(np.uint8(255*(1 - self.__matrix)), 4, constant_values=255)
 
   def show(self):
-    if self.__matrix != []:
+    if self.__matrix is not None:
+      import cv2
       cv2.namedWindow('', cv2.WINDOW_NORMAL)
       cv2.startWindowThread()
-      cv2.imshow('', np.uint8(self.__matrix))
+      cv2.imshow('', self.__image())
       cv2.waitKey(0)
       cv2.destroyAllWindows()
     else:
       print('Error: no qr code created.')
 
-  def save(self):
-    if self.__matrix != []:
-      self.__matrix = cv2.resize(self.__matrix, (720, 720), interpolation = cv2.INTER_AREA)
-      filename = filedialog.asksaveasfilename(
-        title="choose filename",
-        defaultextension='.png',
-        initialfile='qrcode.png'
-      )
-      try:
-       cv2.imwrite(filename, self.__matrix)
-      except:
-        print('Error: no file selected.')
+  def toBytes(self, format='png', scale=10, border=4):
+    """ Image of the QR code as png, pbm or svg bytes, scale is the size of a module and border the quiet zone in modules """
+    if self.__matrix is None:
+      raise ValueError('no qr code created')
+    if not hooks:
+      return encodeImage(self.__matrix, format, scale, border)
+
+    start = perf_counter()
+    image = encodeImage(self.__matrix, format, scale, border)
+    notify({'event': 'render', 'format': format.lower(), 'seconds': perf_counter() - start, 'version': self.version})
+    return image
+
+  def save(self, path=None, scale=10, border=4, format=None):
+    if self.__matrix is not None:
+      if path is None:
+        from tkinter import filedialog
+        path = filedialog.asksaveasfilename(
+          title="choose filename",
+          defaultextension='.png',
+          initialfile='qrcode.png'
+        )
+        if not path:
+          print('Error: no file selected.')
+          return
+      if format is None:
+        format = os.path.splitext(path)[1][1:] or 'png'
+      image = self.toBytes(format, scale, border)
+      with open(path, 'wb') as file:
+        file.write(image)
     else:
-      print('Error: no qr code created.')
\ No newline at end of file
+      print('Error: no qr code created.')
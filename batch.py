@@ -0,0 +1,147 @@
+from dataTables import errorCorretionLevels as eCLs
+from dataTables import errorCorrectionCodeWordsBlockInformation as eCCWBI
+from galoisField import generatorCoefficients, reedSolomonEncode
+from codewordBlocks import blockLayout, interleavingOrder
+from bitBuffer import BitBuffer
+from segmentation import optimalSegments, segmentsLength, encodeSegments
+from matrixTemplates import functionPatternTemplate, maskPatterns
+from matrixTemplates import formatInformationCoordinates, versionInformationCoordinates
+from matrixTemplates import formatInformationBits, versionInformationBits
+from imageFormats import encodeImage
+from instrumentation import hooks, notify
+from QRCode import QRCode
+from verifier import verifyBatch
+
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from itertools import islice
+from time import perf_counter
+import os
+import numpy as np
+
+def warmUp():
+  """ Build the generator polynomials and the templates of every version and error correction level """
+  for errorCorretionLevel in eCLs:
+    for version in range(1, 41):
+      generatorCoefficients(eCCWBI[errorCorretionLevel][version-1][1])
+      blockLayout(version, errorCorretionLevel)
+      interleavingOrder(version, errorCorretionLevel)
+  for version in range(1, 41):
+    functionPatternTemplate(version)
+    maskPatterns(version)
+    formatInformationCoordinates(version)
+    versionInformationCoordinates(version)
+
+def generateChunk(texts, format=None, scale=10, border=4, mask=None, version=None, errorCorretionLevel=None,
+  verify=False, maxVersion=40, policy='prefer-smaller'):
+  """ Packed matrices of the QR codes of the texts, or their images if a format is given. With a version, error
+  correction level and mask the whole chunk goes through generateBatch at exactly that level, otherwise they are the
+  version selection of QRCode. With verify every QR code is decoded and compared with its text before it is returned """
+  if version is not None and errorCorretionLevel is not None and mask is not None:
+    matrices = generateBatch(texts, version, errorCorretionLevel, mask)
+    verified = verifyBatch(matrices, texts) if verify else None
+  else:
+    matrices = []
+    for text in texts:
+      qrCode = QRCode(
+        text, mask=mask, errorCorretionLevel=errorCorretionLevel, version=version, maxVersion=maxVersion, policy=policy
+      )
+      qrCode.create()
+      matrices.append(qrCode.matrix)
+    verified = [verifyBatch([matrix], [text])[0] for matrix, text in zip(matrices, texts)] if verify else None
+  if verified is not None and not all(verified):
+    raise ValueError('qr code does not decode back to its text: %r' % texts[list(verified).index(False)])
+  if format is None:
+    return [np.packbits(matrix).tobytes() for matrix in matrices]
+  return [encodeImage(matrix, format, scale, border) for matrix in matrices]
+
+def generateMany(texts, workers=None, chunksize=64, format=None, scale=10, border=4, mask=None, version=None,
+  errorCorretionLevel=None, verify=False, maxVersion=40, policy='prefer-smaller'):
+  """ Generate the QR codes of an iterable of texts in a pool of worker processes, yielding the results of
+  generateChunk in the order of the texts. At most 2 chunks per worker are in flight at any time """
+  workers = workers or os.cpu_count()
+  texts = iter(texts)
+  chunks = iter(lambda: list(islice(texts, chunksize)), [])
+  options = (format, scale, border, mask, version, errorCorretionLevel, verify, maxVersion, policy)
+  if workers == 1:
+    for chunk in chunks:
+      yield from generateChunk(chunk, *options)
+    return
+
+  executor = ProcessPoolExecutor(workers, initializer=warmUp)
+  try:
+    pending = deque()
+    for chunk in chunks:
+      pending.append(executor.submit(generateChunk, chunk, *options))
+      if len(pending) >= 2*workers:
+        yield from pending.popleft().result()
+    while pending:
+      yield from pending.popleft().result()
+  finally:
+    executor.shutdown(cancel_futures=True)
+
+def generateBatch(texts, version, errorCorretionLevel, mask, out=None):
+  """ Matrices of the QR codes of a sequence of texts that all share the version, error correction level and mask,
+  every step after the data encoding runs once for the whole batch. The matrices are written into out if given,
+  an array of shape (len(texts), size, size) that can also be a memory-mapped file """
+  if mask not in range(8):
+    raise ValueError('mask must be a number from 0 to 7')
+  start = perf_counter() if hooks else None
+  size = (version - 1)*4 + 21
+  if out is None:
+    out = np.empty((len(texts), size, size), dtype=np.uint8)
+  elif out.shape != (len(texts), size, size):
+    raise ValueError('out must have the shape (%d, %d, %d)' % (len(texts), size, size))
+
+  # Step 2: Data Encoding, the terminator and the bits to complete the last codeword are added to each text
+  blocksInformation = eCCWBI[errorCorretionLevel][version-1]
+  bitsRequired = blocksInformation[0]*8
+  encodedTexts = []
+  for text in texts:
+    segments = optimalSegments(text, version)
+    if segmentsLength(segments, version) > bitsRequired:
+      raise ValueError('text does not fit in a version %d-%s qr code: %r' % (version, errorCorretionLevel, text))
+    bitBuffer = BitBuffer()
+    encodeSegments(segments, version, bitBuffer)
+    bitBuffer.append(0, min(4, bitsRequired - len(bitBuffer)))
+    encodedTexts.append(bitBuffer.toBytes())
+
+  # The pad bytes, which alternate from 0xEC right after each text, are the initial value of every codeword and the
+  # encoded texts are scattered over them
+  lengths = np.array([len(encodedText) for encodedText in encodedTexts], dtype=np.intp)
+  padParity = (np.arange(blocksInformation[0] + 1)[None, :] - lengths[:, None])%2
+  dataCodewords = np.where(padParity, np.uint8(0x11), np.uint8(0xEC))
+  dataCodewords[:, -1] = 0
+  rows = np.repeat(np.arange(len(texts)), lengths)
+  columns = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+  dataCodewords[rows, columns] = np.frombuffer(b''.join(encodedTexts), dtype=np.uint8)
+
+  # Step 3: Error Correction Coding of every block of every text
+  blocks = dataCodewords[:, blockLayout(version, errorCorretionLevel)]
+  errorCorrectionCodewords = reedSolomonEncode(blocks, blocksInformation[1])
+
+  # Step 4: Structure Final Message
+  errorCorrectionCodewords = errorCorrectionCodewords.reshape(len(texts), blocks.shape[1]*blocksInformation[1])
+  finalMessages = np.concatenate([dataCodewords[:, :-1], errorCorrectionCodewords], axis=1)
+  finalMessages = finalMessages[:, interleavingOrder(version, errorCorretionLevel)]
+
+  # Steps 5 to 7: the function patterns, remainder bits, format and version information are the same for every text
+  template, functionPatterns, dataRows, dataColumns = functionPatternTemplate(version)
+  maskPattern = maskPatterns(version)[mask]
+  base = template ^ maskPattern
+  formatRows, formatColumns = formatInformationCoordinates(version)
+  base[formatRows, formatColumns] = formatInformationBits(errorCorretionLevel, mask)
+  if version >= 7:
+    versionRows, versionColumns = versionInformationCoordinates(version)
+    base[versionRows, versionColumns] = versionInformationBits(version)
+  dataRows, dataColumns = dataRows[:finalMessages.shape[1]*8], dataColumns[:finalMessages.shape[1]*8]
+
+  out[:] = base
+  out[:, dataRows, dataColumns] = np.unpackbits(finalMessages, axis=1) ^ maskPattern[dataRows, dataColumns]
+
+  if start is not None:
+    notify({
+      'event': 'batch', 'codes': len(texts), 'seconds': perf_counter() - start, 'version': version,
+      'errorCorretionLevel': errorCorretionLevel, 'mask': mask, 'blocks': len(texts)*blocks.shape[1]
+    })
+  return out
@@ -0,0 +1,148 @@
+""" Benchmark of every step of QRCode.create, the rendering and the import time for each mode, version and error
+correction level. The results can be saved as a baseline and later runs compared against it:
+
+  python benchmark.py --output benchmarkBaseline.json
+  python benchmark.py --baseline benchmarkBaseline.json --threshold 0.25
+"""
+from dataTables import alphanumericValues as aVs
+from dataTables import errorCorretionLevels as eCLs
+from dataTables import errorCorrectionCodeWordsBlockInformation as eCCWBI
+from segmentation import optimalSegments, segmentsLength
+from QRCode import QRCode
+
+from statistics import median
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+kanjiCharacters = '日本語漢字東京大阪名古屋横浜神戸京都北海道九州四国沖縄'
+payloadCharacters = {
+  'numeric': '0123456789',
+  'alphanumeric': ''.join(aVs),
+  'byte': 'abcdefghijklmnopqrstuvwxyz?&=_',
+  'kanji': kanjiCharacters
+}
+versions = (1, 2, 5, 7, 10, 15, 20, 27, 30, 35, 40)
+quickVersions = (1, 10, 27, 40)
+
+def payload(mode, length, seed=0):
+  """ Deterministic text of the mode, mixed texts are URLs with long numeric IDs """
+  generator = random.Random(seed)
+  if mode == 'mixed':
+    text = ''
+    while len(text) < length:
+      text += 'https://example.com/item/%016d/' % generator.randrange(10**16)
+    return text[:length]
+  return ''.join(generator.choice(payloadCharacters[mode]) for _ in range(length))
+
+def largestPayload(mode, version, errorCorretionLevel):
+  """ The longest payload of the mode that fits in the version and error correction level """
+  bitsAvailable = eCCWBI[errorCorretionLevel][version-1][0]*8
+  text = payload(mode, 8000)
+  low, high = 0, len(text)
+  while low < high:
+    middle = (low + high + 1)//2
+    if segmentsLength(optimalSegments(text[:middle], version), version) <= bitsAvailable:
+      low = middle
+    else:
+      high = middle - 1
+  return text[:low]
+
+def measure(text, repeat, version=None, errorCorretionLevel=None):
+  stageTimes = {}
+  createTimes = []
+  renderTimes = []
+  for _ in range(repeat):
+    qrCode = QRCode(text, errorCorretionLevel=errorCorretionLevel, version=version)
+    start = time.perf_counter()
+    qrCode.create()
+    createTimes.append(time.perf_counter() - start)
+
+    qrCode = QRCode(text, errorCorretionLevel=errorCorretionLevel, version=version)
+    for name, stage in qrCode.stages():
+      start = time.perf_counter()
+      stage()
+      stageTimes.setdefault(name, []).append(time.perf_counter() - start)
+    start = time.perf_counter()
+    qrCode.toBytes('png')
+    renderTimes.append(time.perf_counter() - start)
+
+  tracemalloc.start()
+  QRCode(text, errorCorretionLevel=errorCorretionLevel, version=version).create()
+  peakMemory = tracemalloc.get_traced_memory()[1]
+  tracemalloc.stop()
+
+  return qrCode, {
+    'stages': {name: median(times) for name, times in stageTimes.items()}, 'create': median(createTimes),
+    'render': median(renderTimes), 'peakMemory': peakMemory
+  }
+
+def importTime(repeat):
+  command = 'import time; start = time.perf_counter(); import QRCode; print(time.perf_counter() - start)'
+  directory = os.path.dirname(os.path.abspath(__file__))
+  return median(float(subprocess.check_output([sys.executable, '-c', command], cwd=directory)) for _ in range(repeat))
+
+def run(modes, versions, repeat):
+  results = {'importTime': importTime(repeat), 'cases': {}}
+  for mode in modes:
+    for version in versions:
+      for errorCorretionLevel in eCLs:
+        text = largestPayload(mode, version, errorCorretionLevel)
+        qrCode, result = measure(text, repeat, version, errorCorretionLevel)
+        result.update({'mode': mode, 'version': version, 'errorCorretionLevel': errorCorretionLevel, 'length': len(text)})
+        results['cases']['%s-%d-%s' % (mode, version, errorCorretionLevel)] = result
+        print('%-24s %8.2f ms create %8.2f ms render %8.0f KiB peak' % (
+          '%s-%d-%s' % (mode, version, errorCorretionLevel), result['create']*1000, result['render']*1000,
+          result['peakMemory']/1024
+        ))
+  print('%-24s %8.2f ms' % ('import', results['importTime']*1000))
+  return results
+
+def regressions(results, baseline, threshold, noise=0.0002):
+  """ Metrics that are more than threshold slower or bigger than the baseline, times below noise seconds are ignored """
+  found = []
+  def compare(name, current, previous, floor):
+    if current > previous*(1 + threshold) and current - previous > floor:
+      found.append('%s: %.6g -> %.6g (%+.0f%%)' % (name, previous, current, (current/previous - 1)*100))
+
+  compare('importTime', results['importTime'], baseline['importTime'], noise)
+  for case, result in results['cases'].items():
+    previous = baseline['cases'].get(case)
+    if previous is None:
+      continue
+    for metric in ('create', 'render'):
+      compare(case + ' ' + metric, result[metric], previous[metric], noise)
+    for stage, seconds in result['stages'].items():
+      compare(case + ' ' + stage, seconds, previous['stages'].get(stage, seconds), noise)
+    compare(case + ' peakMemory', result['peakMemory'], previous['peakMemory'], 64*1024)
+  return found
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description='Benchmark QR code generation')
+  parser.add_argument('--quick', action='store_true', help='only versions ' + ', '.join(map(str, quickVersions)))
+  parser.add_argument('--modes', nargs='+', default=('numeric', 'alphanumeric', 'byte', 'kanji', 'mixed'))
+  parser.add_argument('--repeat', type=int, default=5, help='runs of each case, the median is kept (default 5)')
+  parser.add_argument('--output', help='save the results as json, for example to use them as a baseline')
+  parser.add_argument('--baseline', help='json results to compare against')
+  parser.add_argument('--threshold', type=float, default=0.25, help='allowed slowdown over the baseline (default 0.25)')
+  arguments = parser.parse_args(argv)
+
+  results = run(arguments.modes, quickVersions if arguments.quick else versions, arguments.repeat)
+  if arguments.output:
+    with open(arguments.output, 'w') as file:
+      json.dump(results, file, indent=1, sort_keys=True)
+  if arguments.baseline:
+    with open(arguments.baseline) as file:
+      found = regressions(results, json.load(file), arguments.threshold)
+    for regression in found:
+      print('Regression: ' + regression)
+    return 1 if found else 0
+  return 0
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,29 @@
+class BitBuffer:
+  """ Sequence of bits stored as bytes, the most significant bit of each byte comes first """
+  def __init__(self):
+    self.__bytes = bytearray()
+    self.__pendingBits = 0
+    self.__pendingLength = 0
+
+  def __len__(self):
+    return len(self.__bytes)*8 + self.__pendingLength
+
+  def append(self, value, length):
+    self.__pendingBits = (self.__pendingBits << length) | value
+    self.__pendingLength += length
+    while self.__pendingLength >= 8:
+      self.__pendingLength -= 8
+      self.__bytes.append(self.__pendingBits >> self.__pendingLength)
+      self.__pendingBits &= (1 << self.__pendingLength) - 1
+
+  def extend(self, data):
+    if self.__pendingLength == 0:
+      self.__bytes.extend(data)
+    else:
+      for byte in data:
+        self.append(byte, 8)
+
+  def toBytes(self):
+    if self.__pendingLength == 0:
+      return bytes(self.__bytes)
+    return bytes(self.__bytes) + bytes([self.__pendingBits << (8 - self.__pendingLength)])
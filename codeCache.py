@@ -0,0 +1,166 @@
+from QRCode import QRCode
+from imageFormats import encodeImage
+
+from collections import OrderedDict
+from hashlib import sha256
+import os
+import tempfile
+import threading
+
+# Version selection of QRCode by default, it is left out of the keys so they do not change when it is not used
+defaultSelection = (None, None, 40, 'prefer-smaller')
+
+class CodeCache:
+  """ Bounded LRU cache of packed matrices and encoded images keyed by the hash of everything that changes them.
+  Entries evicted from memory stay available on disk when a directory is given. The directory is unbounded unless
+  maxDiskBytes is given, then the least recently used files are deleted. Each CodeCache keeps that budget on its own,
+  from the files found when it is created and the ones it writes, so caches sharing a directory can overshoot it """
+  def __init__(self, maxEntries=1024, maxBytes=64*1024*1024, directory=None, maxDiskBytes=None):
+    self.maxEntries = maxEntries
+    self.maxBytes = maxBytes
+    self.directory = directory
+    self.maxDiskBytes = maxDiskBytes
+    self.hits = 0
+    self.diskHits = 0
+    self.misses = 0
+    self.evictions = 0
+    self.diskEvictions = 0
+    self.__entries = OrderedDict()
+    self.__bytes = 0
+    self.__diskEntries = OrderedDict()
+    self.__diskBytes = 0
+    self.__lock = threading.Lock()
+    if directory is not None:
+      os.makedirs(directory, exist_ok=True)
+      if maxDiskBytes is not None:
+        self.__scanDisk()
+
+  @staticmethod
+  def key(text, mask=None, format=None, scale=None, border=None, selection=defaultSelection):
+    """ Content address of a QR code, format, scale and border are None for the packed matrix and selection is the
+    (errorCorretionLevel, version, maxVersion, policy) given to QRCode """
+    content = (text, mask, format, scale, border) + ((tuple(selection),) if tuple(selection) != defaultSelection else ())
+    return sha256(repr(content).encode('utf-8', 'surrogatepass')).hexdigest()
+
+  def __len__(self):
+    return len(self.__entries)
+
+  @property
+  def size(self):
+    """ Bytes of the entries kept in memory """
+    return self.__bytes
+
+  def __diskPath(self, key):
+    return os.path.join(self.directory, key[:2], key)
+
+  def __scanDisk(self):
+    # Files already in the directory, from the least to the most recently used
+    files = []
+    for subdirectory in os.scandir(self.directory):
+      if subdirectory.is_dir():
+        for entry in os.scandir(subdirectory.path):
+          information = entry.stat()
+          files.append((information.st_mtime, entry.name, information.st_size))
+    for modified, key, size in sorted(files):
+      self.__diskEntries[key] = size
+      self.__diskBytes += size
+
+  def get(self, key):
+    with self.__lock:
+      value = self.__entries.get(key)
+      if value is not None:
+        self.__entries.move_to_end(key)
+        self.hits += 1
+        return value
+    if self.directory is not None:
+      try:
+        with open(self.__diskPath(key), 'rb') as file:
+          value = file.read()
+      except FileNotFoundError:
+        pass
+      else:
+        with self.__lock:
+          self.diskHits += 1
+          if key in self.__diskEntries:
+            self.__diskEntries.move_to_end(key)
+        if self.maxDiskBytes is not None:
+          try:
+            os.utime(self.__diskPath(key))
+          except FileNotFoundError:
+            pass
+        self.__remember(key, value)
+        return value
+    with self.__lock:
+      self.misses += 1
+    return None
+
+  def put(self, key, value):
+    self.__remember(key, value)
+    if self.directory is not None:
+      os.makedirs(os.path.dirname(self.__diskPath(key)), exist_ok=True)
+      file, temporaryPath = tempfile.mkstemp(dir=self.directory)
+      with os.fdopen(file, 'wb') as file:
+        file.write(value)
+      os.replace(temporaryPath, self.__diskPath(key))
+      if self.maxDiskBytes is not None:
+        self.__rememberOnDisk(key, len(value))
+
+  def __rememberOnDisk(self, key, size):
+    evicted = []
+    with self.__lock:
+      self.__diskBytes += size - self.__diskEntries.pop(key, 0)
+      self.__diskEntries[key] = size
+      while self.__diskBytes > self.maxDiskBytes:
+        evictedKey, evictedSize = self.__diskEntries.popitem(last=False)
+        self.__diskBytes -= evictedSize
+        self.diskEvictions += 1
+        evicted.append(evictedKey)
+    for evictedKey in evicted:
+      try:
+        os.remove(self.__diskPath(evictedKey))
+      except FileNotFoundError:
+        pass
+
+  def __remember(self, key, value):
+    if len(value) > self.maxBytes:
+      return
+    with self.__lock:
+      if key in self.__entries:
+        self.__bytes -= len(self.__entries.pop(key))
+      self.__entries[key] = value
+      self.__bytes += len(value)
+      while len(self.__entries) > self.maxEntries or self.__bytes > self.maxBytes:
+        self.__bytes -= len(self.__entries.popitem(last=False)[1])
+        self.evictions += 1
+
+  def packedMatrix(self, text, mask=None, errorCorretionLevel=None, version=None, maxVersion=40, policy='prefer-smaller'):
+    """ Packed matrix of the QR code of the text, created only if it is not cached """
+    key = self.key(text, mask, selection=(errorCorretionLevel, version, maxVersion, policy))
+    packed = self.get(key)
+    if packed is None:
+      qrCode = QRCode(
+        text, mask=mask, errorCorretionLevel=errorCorretionLevel, version=version, maxVersion=maxVersion, policy=policy
+      )
+      qrCode.create()
+      packed = qrCode.packedMatrix().tobytes()
+      self.put(key, packed)
+    return packed
+
+  def image(self, text, format='png', scale=10, border=4, mask=None, errorCorretionLevel=None, version=None,
+    maxVersion=40, policy='prefer-smaller'):
+    """ Image of the QR code of the text as bytes, the matrix is taken from the cache if only the image is missing """
+    selection = (errorCorretionLevel, version, maxVersion, policy)
+    key = self.key(text, mask, format.lower(), scale, border, selection)
+    image = self.get(key)
+    if image is None:
+      image = encodeImage(QRCode.unpackMatrix(self.packedMatrix(text, mask, *selection)), format, scale, border)
+      self.put(key, image)
+    return image
+
+  def statistics(self):
+    """ Counters of the cache for a metrics exporter """
+    return {
+      'hits': self.hits, 'diskHits': self.diskHits, 'misses': self.misses, 'evictions': self.evictions,
+      'entries': len(self.__entries), 'bytes': self.__bytes, 'diskEvictions': self.diskEvictions,
+      'diskBytes': self.__diskBytes
+    }
@@ -0,0 +1,39 @@
+from dataTables import errorCorrectionCodeWordsBlockInformation as eCCWBI
+
+from functools import lru_cache
+import numpy as np
+
+@lru_cache(maxsize=None)
+def interleavingOrder(version, errorCorretionLevel):
+  """ Order in which the data codewords followed by the error correction codewords of every block are placed """
+  blocksInformation = eCCWBI[errorCorretionLevel][version-1]
+  blockSizes = [blocksInformation[3]]*blocksInformation[2] + [blocksInformation[5]]*blocksInformation[4]
+  blockStarts = np.cumsum([0] + blockSizes[:-1])
+
+  # Data codewords are taken one from each block in turn, group 1 blocks run out one codeword earlier
+  codewordIndexes = np.arange(max(blockSizes))
+  dataOrder = (blockStarts[None, :] + codewordIndexes[:, None])[codewordIndexes[:, None] < np.array(blockSizes)[None, :]]
+
+  # Error correction codewords are all the same length and follow the data codewords block by block
+  errorCorrectionCodewords = blocksInformation[1]
+  errorCorrectionOrder = blocksInformation[0] + np.arange(len(blockSizes)*errorCorrectionCodewords).reshape(
+    len(blockSizes), errorCorrectionCodewords
+  ).T.ravel()
+
+  order = np.concatenate([dataOrder, errorCorrectionOrder])
+  order.flags.writeable = False
+  return order
+
+@lru_cache(maxsize=None)
+def blockLayout(version, errorCorretionLevel):
+  """ Index of the data codeword in each position of the blocks, blocks of group 1 are one codeword shorter and start
+  with the index after the last data codeword, which stands for a leading zero """
+  blocksInformation = eCCWBI[errorCorretionLevel][version-1]
+  blockSizes = [blocksInformation[3]]*blocksInformation[2] + [blocksInformation[5]]*blocksInformation[4]
+  layout = np.full((len(blockSizes), max(blockSizes)), blocksInformation[0])
+  start = 0
+  for block, blockSize in zip(layout, blockSizes):
+    block[len(block) - blockSize:] = np.arange(start, start + blockSize)
+    start += blockSize
+  layout.flags.writeable = False
+  return layout
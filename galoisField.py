@@ -0,0 +1,59 @@
+from functools import lru_cache
+import numpy as np
+
+# Powers of 2 using byte-wise modulo 100011101, the value of 2^i is equal to the value of index i
+antilogTable = [1]
+while len(antilogTable) != 256:
+  power = antilogTable[-1]*2
+  antilogTable.append(power if power < 256 else power^285)
+antilogTable = tuple(antilogTable)
+
+# The exponent of 2 that results in the value of the index (2^255 = 2^0 = 1, so the exponent of 1 is 0)
+logTable = [0]*256
+for exponent in range(254, -1, -1):
+  logTable[antilogTable[exponent]] = exponent
+logTable = tuple(logTable)
+
+# The product of the values of the row and column indexes
+multiplicationTable = np.array(antilogTable, dtype=np.uint8)[np.add.outer(logTable, logTable)%255]
+multiplicationTable[0, :] = 0
+multiplicationTable[:, 0] = 0
+
+@lru_cache(maxsize=None)
+def generatorPolynomial(errorCorrectionCodewords):
+  """ Generator polynomial in alpha notation, lowest degree term first """
+  generator = [1, 25, 0]
+  for degree in range(2, errorCorrectionCodewords):
+    auxGenerator = [antilogTable[(x + degree)%255] for x in generator] + [0]
+    for i in range(len(generator)):
+      auxGenerator[i + 1] ^= antilogTable[generator[i]]
+    generator = [logTable[x] for x in auxGenerator]
+  return tuple(generator)
+
+@lru_cache(maxsize=None)
+def generatorCoefficients(errorCorrectionCodewords):
+  """ Generator polynomial in integer notation, highest degree term first """
+  coefficients = np.array([antilogTable[x] for x in reversed(generatorPolynomial(errorCorrectionCodewords))], dtype=np.uint8)
+  coefficients.flags.writeable = False
+  return coefficients
+
+def reedSolomonEncode(blocks, errorCorrectionCodewords):
+  """ Error correction codewords for every row of blocks, all rows are divided at once """
+  blocks = np.asarray(blocks, dtype=np.uint8)
+  generator = generatorCoefficients(errorCorrectionCodewords)
+  dataCodewords = blocks.shape[-1]
+  message = np.zeros(blocks.shape[:-1] + (dataCodewords + errorCorrectionCodewords,), dtype=np.uint8)
+  message[..., :dataCodewords] = blocks
+  for i in range(dataCodewords):
+    message[..., i:i + errorCorrectionCodewords + 1] ^= multiplicationTable[message[..., i, None], generator]
+  return message[..., dataCodewords:]
+
+def syndromes(codewords, errorCorrectionCodewords):
+  """ Values of every row of codewords, highest degree term first, at the roots 2^0 to 2^(n-1) of the generator
+  polynomial, they are all zero when the error correction codewords match the data codewords """
+  codewords = np.asarray(codewords, dtype=np.uint8)
+  roots = np.array(antilogTable[:errorCorrectionCodewords], dtype=np.uint8)
+  values = np.zeros(codewords.shape[:-1] + (errorCorrectionCodewords,), dtype=np.uint8)
+  for i in range(codewords.shape[-1]):
+    values = multiplicationTable[values, roots] ^ codewords[..., i, None]
+  return values
@@ -0,0 +1,56 @@
+import struct
+import zlib
+import numpy as np
+
+imageFormats = ('png', 'pbm', 'svg')
+
+def scaledModules(matrix, scale, border):
+  """ Modules with a light border of border modules around them, each module repeated scale times in both directions """
+  modules = np.pad(np.asarray(matrix, dtype=bool), border)
+  return np.repeat(np.repeat(modules, scale, axis=0), scale, axis=1)
+
+def _pngChunk(chunkType, data):
+  return struct.pack('>I', len(data)) + chunkType + data + struct.pack('>I', zlib.crc32(chunkType + data))
+
+def toPNG(matrix, scale, border):
+  # 1 bit grayscale, 1 is white, every row starts with filter type 0
+  pixels = ~scaledModules(matrix, scale, border)
+  height, width = pixels.shape
+  rows = np.packbits(pixels, axis=1)
+  scanlines = np.zeros((height, rows.shape[1] + 1), dtype=np.uint8)
+  scanlines[:, 1:] = rows
+  return (
+    b'\x89PNG\r\n\x1a\n' + _pngChunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 1, 0, 0, 0, 0)) +
+    _pngChunk(b'IDAT', zlib.compress(scanlines.tobytes())) + _pngChunk(b'IEND', b'')
+  )
+
+def toPBM(matrix, scale, border):
+  # Binary portable bitmap, 1 is black
+  pixels = scaledModules(matrix, scale, border)
+  height, width = pixels.shape
+  return b'P4\n%d %d\n' % (width, height) + np.packbits(pixels, axis=1).tobytes()
+
+def toSVG(matrix, scale, border):
+  # One path with a rectangle for every horizontal run of dark modules, in module units
+  modules = np.pad(np.asarray(matrix, dtype=np.int8), ((0, 0), (1, 1)))
+  size = modules.shape[0] + 2*border
+  edges = np.diff(modules, axis=1)
+  starts, ends = np.nonzero(edges == 1), np.nonzero(edges == -1)[1]
+  path = ''.join(
+    'M%d,%dh%dv1h-%dz' % (column + border, row + border, end - column, end - column)
+    for row, column, end in zip(starts[0], starts[1], ends)
+  )
+  return (
+    '<svg xmlns="http://www.w3.org/2000/svg" width="%d" height="%d" viewBox="0 0 %d %d" shape-rendering="crispEdges">'
+    '<rect width="100%%" height="100%%" fill="#fff"/><path fill="#000" d="%s"/></svg>\n'
+    % (size*scale, size*scale, size, size, path)
+  ).encode()
+
+def encodeImage(matrix, format, scale, border):
+  """ Image of the matrix in one of imageFormats as bytes """
+  format = format.lower()
+  if format not in imageFormats:
+    raise ValueError('format must be one of ' + ', '.join(imageFormats))
+  if scale < 1 or border < 0:
+    raise ValueError('scale must be at least 1 and border can not be negative')
+  return {'png': toPNG, 'pbm': toPBM, 'svg': toSVG}[format](matrix, int(scale), int(border))
@@ -0,0 +1,93 @@
+from contextlib import contextmanager
+from bisect import bisect_left
+import threading
+
+# Callbacks that receive an event dictionary after every QRCode.create, QRCode.toBytes and generateBatch of this process.
+# When the list is empty nothing is measured
+hooks = []
+
+def addHook(callback):
+  hooks.append(callback)
+
+def removeHook(callback):
+  hooks.remove(callback)
+
+@contextmanager
+def instrument(callback):
+  """ Send the events of the block to the callback """
+  addHook(callback)
+  try:
+    yield callback
+  finally:
+    removeHook(callback)
+
+def notify(event):
+  for hook in list(hooks):
+    hook(event)
+
+class Metrics:
+  """ Hook that aggregates events into counters and histograms of seconds, snapshot and exposition are for exporters """
+  buckets = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+  def __init__(self):
+    self.__lock = threading.Lock()
+    self.__counters = {}
+    self.__histograms = {}
+
+  def __count(self, name, labels, amount=1):
+    key = (name, labels)
+    self.__counters[key] = self.__counters.get(key, 0) + amount
+
+  def __observe(self, name, labels, seconds):
+    histogram = self.__histograms.setdefault((name, labels), [[0]*(len(self.buckets) + 1), 0.0, 0])
+    histogram[0][bisect_left(self.buckets, seconds)] += 1
+    histogram[1] += seconds
+    histogram[2] += 1
+
+  def __call__(self, event):
+    with self.__lock:
+      if event['event'] == 'create':
+        self.__count('created_total', (
+          ('version', event['version']), ('errorCorretionLevel', event['errorCorretionLevel']),
+          ('encodingMode', event['encodingMode']), ('mask', event['mask'])
+        ))
+        self.__count('reed_solomon_blocks_total', (), event['blocks'])
+        for stage, seconds in event['stages'].items():
+          self.__observe('stage_seconds', (('stage', stage),), seconds)
+        self.__observe('create_seconds', (('version', event['version']),), event['seconds'])
+      elif event['event'] == 'batch':
+        self.__count('created_total', (
+          ('version', event['version']), ('errorCorretionLevel', event['errorCorretionLevel']),
+          ('encodingMode', 'batch'), ('mask', event['mask'])
+        ), event['codes'])
+        self.__count('reed_solomon_blocks_total', (), event['blocks'])
+        self.__observe('batch_seconds', (('version', event['version']),), event['seconds'])
+      elif event['event'] == 'render':
+        self.__count('rendered_total', (('format', event['format']),))
+        self.__observe('render_seconds', (('format', event['format']),), event['seconds'])
+
+  def snapshot(self):
+    """ Counters as {(name, labels): value} and histograms as {(name, labels): (bucket counts, sum, count)} """
+    with self.__lock:
+      counters = dict(self.__counters)
+      histograms = {key: (list(value[0]), value[1], value[2]) for key, value in self.__histograms.items()}
+    return counters, histograms
+
+  def exposition(self, prefix='qrcode_'):
+    """ The metrics in the Prometheus text format """
+    def labelText(labels, *extra):
+      labels = list(labels) + list(extra)
+      return '{' + ','.join('%s="%s"' % label for label in labels) + '}' if labels else ''
+
+    counters, histograms = self.snapshot()
+    lines = []
+    for (name, labels), value in sorted(counters.items(), key=str):
+      lines.append('%s%s%s %d' % (prefix, name, labelText(labels), value))
+    for (name, labels), (bucketCounts, total, count) in sorted(histograms.items(), key=str):
+      cumulative = 0
+      for bound, bucketCount in zip(self.buckets + ('+Inf',), bucketCounts):
+        cumulative += bucketCount
+        lines.append('%s%s_bucket%s %d' % (prefix, name, labelText(labels, ('le', bound)), cumulative))
+      lines.append('%s%s_sum%s %r' % (prefix, name, labelText(labels), total))
+      lines.append('%s%s_count%s %d' % (prefix, name, labelText(labels), count))
+    return '\n'.join(lines) + '\n'
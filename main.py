@@ -1,6 +1,186 @@
 from QRCode import QRCode
+from batch import generateMany
+from imageFormats import imageFormats, scaledModules
+from versionSelection import policies
 
-qrCode = QRCode('')
-qrCode.create()
-qrCode.show()
-qrCode.save()
\ No newline at end of file
+import argparse
+import csv
+import io
+import os
+import struct
+import sys
+import tarfile
+import time
+import zipfile
+import numpy as np
+
+class DirectoryWriter:
+  def __init__(self, path, format):
+    os.makedirs(path, exist_ok=True)
+    self.path = path
+    self.format = format
+
+  def write(self, index, image):
+    with open(os.path.join(self.path, '%08d.%s' % (index, self.format)), 'wb') as file:
+      file.write(image)
+
+  def close(self):
+    pass
+
+class TarWriter:
+  def __init__(self, path, format):
+    self.archive = tarfile.open(path, 'w|gz' if path.endswith(('.tar.gz', '.tgz')) else 'w|')
+    self.format = format
+
+  def write(self, index, image):
+    information = tarfile.TarInfo('%08d.%s' % (index, self.format))
+    information.size = len(image)
+    information.mtime = time.time()
+    self.archive.addfile(information, io.BytesIO(image))
+
+  def close(self):
+    self.archive.close()
+
+class ZipWriter:
+  def __init__(self, path, format):
+    self.archive = zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED if format == 'png' else zipfile.ZIP_DEFLATED)
+    self.format = format
+
+  def write(self, index, image):
+    self.archive.writestr('%08d.%s' % (index, self.format), image)
+
+  def close(self):
+    self.archive.close()
+
+class SpriteSheetWriter:
+  """ Grayscale .npy image with the QR codes side by side in rows of the given number of columns, it is written one row
+  at a time and can be opened with np.load(path, mmap_mode='r') """
+  headerLength = 128
+
+  def __init__(self, path, version, scale, border, columns):
+    self.file = open(path, 'wb')
+    self.file.write(b'\0'*self.headerLength)
+    self.scale, self.border, self.columns = scale, border, columns
+    self.cellSize = ((version - 1)*4 + 21 + 2*border)*scale
+    self.rows = 0
+    self.row = []
+
+  def write(self, index, packedMatrix):
+    self.row.append(np.uint8(255)*~scaledModules(QRCode.unpackMatrix(packedMatrix), self.scale, self.border))
+    if len(self.row) == self.columns:
+      self.__writeRow()
+
+  def __writeRow(self):
+    row = np.full((self.cellSize, self.cellSize*self.columns), 255, dtype=np.uint8)
+    for column, cell in enumerate(self.row):
+      row[:, column*self.cellSize:(column + 1)*self.cellSize] = cell
+    self.file.write(row.tobytes())
+    self.rows += 1
+    self.row = []
+
+  def close(self):
+    if self.row:
+      self.__writeRow()
+    header = "{'descr': '|u1', 'fortran_order': False, 'shape': (%d, %d), }" % (
+      self.rows*self.cellSize, self.columns*self.cellSize
+    )
+    header = header.ljust(self.headerLength - 11) + '\n'
+    self.file.seek(0)
+    self.file.write(b'\x93NUMPY\x01\x00' + struct.pack('<H', len(header)) + header.encode('latin1'))
+    self.file.close()
+
+def _columnValues(file, rows, column):
+  with file:
+    for row in rows:
+      yield row[column]
+
+def readPayloads(arguments, parser):
+  """ Texts of every line of stdin or of the csv column, the header is checked before any text is read """
+  if arguments.csv is None:
+    return (line.rstrip('\r\n') for line in sys.stdin)
+  file = open(arguments.csv, newline='', encoding='utf-8')
+  rows = csv.reader(file)
+  column = arguments.column
+  if not column.isdigit() or arguments.header:
+    header = next(rows, None)
+    if header is None:
+      file.close()
+      parser.error('%s is empty' % arguments.csv)
+    if not column.isdigit():
+      if column not in header:
+        file.close()
+        parser.error('column %r is not in the header of %s' % (column, arguments.csv))
+      column = header.index(column)
+  return _columnValues(file, rows, int(column))
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description='Generate QR codes from a text or from every line of stdin or a csv column')
+  parser.add_argument('text', nargs='?', help='text of a single qr code, shown and saved interactively without --output')
+  parser.add_argument('--csv', help='read the texts from a column of this csv file instead of stdin')
+  parser.add_argument('--column', default='0', help='name or index of the csv column (default 0)')
+  parser.add_argument('--header', action='store_true', help='skip the first csv row when the column is an index')
+  parser.add_argument('--output', help='directory, .tar, .tar.gz, .zip or .npy sprite sheet (default qrcodes)')
+  parser.add_argument('--format', choices=imageFormats, help='default png, or the extension of a single --output file')
+  parser.add_argument('--scale', type=int, default=10, help='pixels per module (default 10)')
+  parser.add_argument('--border', type=int, default=4, help='quiet zone in modules (default 4)')
+  parser.add_argument('--mask', type=int, choices=range(8), help='use this mask instead of the best one')
+  parser.add_argument('--version', type=int, choices=range(1, 41), help='version of every qr code (sprite sheets)')
+  parser.add_argument('--level', choices='LMQH', help='lowest error correction level, exact with --version and --mask')
+  parser.add_argument('--max-version', type=int, default=40, choices=range(1, 41), help='largest version (default 40)')
+  parser.add_argument('--policy', default='prefer-smaller', choices=policies,
+    help='prefer smaller versions or stronger error correction levels (default prefer-smaller)')
+  parser.add_argument('--columns', type=int, default=32, help='qr codes per row of a sprite sheet (default 32)')
+  parser.add_argument('--workers', type=int, default=os.cpu_count(), help='worker processes (default one per cpu)')
+  parser.add_argument('--verify', action='store_true', help='decode every qr code and stop if one does not match its text')
+  parser.add_argument('--chunksize', type=int, default=64, help='texts sent to a worker at a time (default 64)')
+  arguments = parser.parse_args(argv)
+
+  if arguments.text is not None:
+    qrCode = QRCode(
+      arguments.text, mask=arguments.mask, errorCorretionLevel=arguments.level, version=arguments.version,
+      maxVersion=arguments.max_version, policy=arguments.policy
+    )
+    qrCode.create()
+    if arguments.output is None:
+      qrCode.show()
+      qrCode.save()
+    else:
+      qrCode.save(arguments.output, arguments.scale, arguments.border, arguments.format)
+    return
+
+  output = arguments.output or 'qrcodes'
+  format = arguments.format or 'png'
+  payloads = readPayloads(arguments, parser)
+  if output.endswith('.npy'):
+    if arguments.version is None or arguments.level is None or arguments.mask is None:
+      parser.error('a sprite sheet needs --version, --level and --mask')
+    writer = SpriteSheetWriter(output, arguments.version, arguments.scale, arguments.border, arguments.columns)
+    results = generateMany(
+      payloads, arguments.workers, arguments.chunksize, mask=arguments.mask,
+      version=arguments.version, errorCorretionLevel=arguments.level, verify=arguments.verify
+    )
+  else:
+    if output.endswith(('.tar', '.tar.gz', '.tgz')):
+      writer = TarWriter(output, format)
+    elif output.endswith('.zip'):
+      writer = ZipWriter(output, format)
+    else:
+      writer = DirectoryWriter(output, format)
+    results = generateMany(
+      payloads, arguments.workers, arguments.chunksize, format, arguments.scale,
+      arguments.border, arguments.mask, arguments.version, arguments.level, arguments.verify, arguments.max_version,
+      arguments.policy
+    )
+
+  start = time.perf_counter()
+  count = 0
+  try:
+    for count, result in enumerate(results, 1):
+      writer.write(count - 1, result)
+  finally:
+    writer.close()
+  elapsed = time.perf_counter() - start
+  print('%d qr codes in %.2f s (%.0f codes/s)' % (count, elapsed, count/elapsed if elapsed else 0), file=sys.stderr)
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,44 @@
+import numpy as np
+
+# Finder-like patterns with 4 light modules on one side, searched as 11-bit numbers
+finderLikePatterns = (0b10111010000, 0b00001011101)
+
+def _consecutiveModulesPenalty(modules):
+  # Evaluation Condition #1: 3 points for a run of 5 modules of the same color in a row, 1 more for each extra module
+  candidates, rows, size = modules.shape
+  runStarts = np.ones((candidates*rows, size), dtype=bool)
+  runStarts[:, 1:] = modules.reshape(candidates*rows, size)[:, 1:] != modules.reshape(candidates*rows, size)[:, :-1]
+  runStarts = np.flatnonzero(runStarts)
+  runLengths = np.diff(runStarts, append=candidates*rows*size)
+  penalties = np.where(runLengths >= 5, runLengths - 2, 0)
+  return np.bincount(runStarts//(rows*size), weights=penalties, minlength=candidates)
+
+def _blocksPenalty(modules):
+  # Evaluation Condition #2: 3 points for each 2x2 block of modules of the same color
+  topLeft = modules[:, :-1, :-1]
+  sameColor = (topLeft == modules[:, 1:, :-1]) & (topLeft == modules[:, :-1, 1:]) & (topLeft == modules[:, 1:, 1:])
+  return 3*sameColor.sum(axis=(1, 2))
+
+def _finderLikePenalty(modules):
+  # Evaluation Condition #3: 40 points for each 1:1:3:1:1 pattern with 4 light modules on either side
+  ## Every window of 11 modules is read as a number by shifting in one module at a time
+  windows = np.zeros(modules.shape[:2] + (modules.shape[2] - 10,), dtype=np.uint16)
+  for offset in range(11):
+    windows <<= 1
+    windows |= modules[:, :, offset:offset + windows.shape[2]]
+  return 40*((windows == finderLikePatterns[0]) | (windows == finderLikePatterns[1])).sum(axis=(1, 2))
+
+def _darkModulesPenalty(modules):
+  # Evaluation Condition #4: 10 points for every 5% the dark modules deviate from 50%
+  total = modules.shape[1]*modules.shape[2]
+  darkModules = modules.sum(axis=(1, 2), dtype=int)
+  return 10*(np.abs(20*darkModules - 10*total)//total)
+
+def penaltyScores(modules):
+  """ Penalty score of each matrix of a stack of matrices of dark modules """
+  modules = np.asarray(modules, dtype=np.uint8)
+  transposed = modules.transpose(0, 2, 1)
+  return (
+    _consecutiveModulesPenalty(modules) + _consecutiveModulesPenalty(transposed) + _blocksPenalty(modules) +
+    _finderLikePenalty(modules) + _finderLikePenalty(transposed) + _darkModulesPenalty(modules)
+  ).astype(int)
@@ -0,0 +1,116 @@
+from dataTables import alignmentPatternLocations as aPLs
+from dataTables import formatInformationString as fISs
+from dataTables import versionInformationStrings as vISs
+
+from functools import lru_cache
+import numpy as np
+
+@lru_cache(maxsize=None)
+def functionPatternTemplate(version):
+  """ Modules of the function patterns of the version (1 is dark), the mask of the function patterns and reserved areas
+  and the data module coordinates in placement order """
+  size = (version - 1)*4 + 21
+  matrix = np.zeros((size, size), dtype=np.uint8)
+  functionPatterns = np.zeros((size, size), dtype=bool)
+
+  # Finder Patterns and Separators
+  for top, left in ((0, 0), (0, size-7), (size-7, 0)):
+    matrix[top:top+7, left:left+7] = 1
+    matrix[top+1:top+6, left+1:left+6] = 0
+    matrix[top+2:top+5, left+2:left+5] = 1
+    functionPatterns[max(top-1, 0):top+8, max(left-1, 0):left+8] = True
+
+  # Alignment Patterns
+  alignmentPatternLocation = aPLs[version-1]
+  for i in alignmentPatternLocation:
+    for j in alignmentPatternLocation:
+      if not functionPatterns[j-1,i-1]:
+        matrix[j-2:j+3, i-2:i+3] = 1
+        matrix[j-1:j+2, i-1:i+2] = 0
+        matrix[j, i] = 1
+        functionPatterns[j-2:j+3, i-2:i+3] = True
+
+  # Timing Patterns
+  matrix[8:size-8:2,6] = 1
+  matrix[6,8:size-8:2] = 1
+  functionPatterns[8:size-8,6] = True
+  functionPatterns[6,8:size-8] = True
+
+  # Dark Module and Reserved Areas
+  matrix[4*version+9,8] = 1
+  functionPatterns[4*version+9,8] = True
+  functionPatterns[8,0:9] = True
+  functionPatterns[8,size-8:size] = True
+  functionPatterns[0:8,8] = True
+  functionPatterns[size-8:size,8] = True
+  if version >= 7:
+    functionPatterns[0:6, size-11:size-8] = True
+    functionPatterns[size-11:size-8, 0:6] = True
+
+  # Data modules are placed in pairs of columns from right to left skipping the vertical timing pattern,
+  # going upwards in the first pair, downwards in the next one and so on
+  rows, columns = [], []
+  upwards = True
+  for right in range(size-1, 0, -2):
+    if right <= 6:
+      right -= 1
+    for j in (range(size-1, -1, -1) if upwards else range(size)):
+      for i in (right, right-1):
+        if not functionPatterns[j, i]:
+          rows.append(j)
+          columns.append(i)
+    upwards = not upwards
+
+  rows, columns = np.array(rows), np.array(columns)
+  for array in (matrix, functionPatterns, rows, columns):
+    array.flags.writeable = False
+  return matrix, functionPatterns, rows, columns
+
+@lru_cache(maxsize=None)
+def maskPatterns(version):
+  """ The modules switched by each of the 8 mask patterns, only data modules are switched """
+  template, functionPatterns, rows, columns = functionPatternTemplate(version)
+  i, j = np.indices(template.shape)
+  formulas = np.array([
+    (i+j)%2, i%2, j%3, (i+j)%3, (i//2 + j//3)%2, ((i*j)%2) + ((i*j)%3), (((i*j)%2) + ((i*j)%3))%2,
+    (((i+j)%2) + ((i*j)%3))%2
+  ])
+  patterns = (formulas == 0) & ~functionPatterns
+  patterns.flags.writeable = False
+  return patterns
+
+@lru_cache(maxsize=None)
+def formatInformationCoordinates(version):
+  """ Rows and columns of both copies of the format information, in the order of the bits of the format string """
+  size = (version - 1)*4 + 21
+  rows = [8]*8 + [7] + list(range(5, -1, -1)) + list(range(size-1, size-8, -1)) + [8]*8
+  columns = [0, 1, 2, 3, 4, 5, 7, 8] + [8]*7 + [8]*7 + list(range(size-8, size))
+  rows, columns = np.array(rows), np.array(columns)
+  for array in (rows, columns):
+    array.flags.writeable = False
+  return rows, columns
+
+@lru_cache(maxsize=None)
+def versionInformationCoordinates(version):
+  """ Rows and columns of both copies of the version information, from the least significant bit of the version string """
+  size = (version - 1)*4 + 21
+  bit = np.arange(18)
+  rows = np.concatenate([size - 11 + bit%3, bit//3])
+  columns = np.concatenate([bit//3, size - 11 + bit%3])
+  for array in (rows, columns):
+    array.flags.writeable = False
+  return rows, columns
+
+@lru_cache(maxsize=None)
+def formatInformationBits(errorCorretionLevel, mask):
+  """ Bits of both copies of the format information in the order of formatInformationCoordinates """
+  bits = np.tile(np.array(list(fISs[errorCorretionLevel][mask])) == '1', 2)
+  bits.flags.writeable = False
+  return bits
+
+@lru_cache(maxsize=None)
+def versionInformationBits(version):
+  """ Bits of both copies of the version information in the order of versionInformationCoordinates """
+  bits = np.tile(np.array(list(reversed(vISs[version-7]))) == '1', 2)
+  bits.flags.writeable = False
+  return bits
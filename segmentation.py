@@ -0,0 +1,186 @@
+from dataTables import alphanumericValues as aVs
+from dataTables import modeIndicators as mIs
+from dataTables import characterCountIndicators as cCIs
+
+modes = ('numeric', 'alphanumeric', 'byte', 'kanji')
+_alphanumericCharacters = frozenset(aVs)
+
+# Extended Channel Interpretation assignment number of UTF-8
+utf8Assignment = 26
+
+def characterCountIndicatorIndex(version):
+  """ Index of the character count indicator sizes used by the version """
+  if version <= 9:
+    return 0
+  elif version <= 26:
+    return 1
+  return 2
+
+def _kanjiValue(character):
+  # Shift JIS double byte characters from 0x8140 to 0x9FFC and from 0xE040 to 0xEBBF, None for any other character
+  try:
+    shiftJIS = character.encode('shift_jis')
+  except UnicodeEncodeError:
+    return None
+  if len(shiftJIS) != 2:
+    return None
+  value = int.from_bytes(shiftJIS, 'big')
+  if 0x8140 <= value <= 0x9FFC:
+    value -= 0x8140
+  elif 0xE040 <= value <= 0xEBBF:
+    value -= 0xC140
+  else:
+    return None
+  return (value >> 8)*0xC0 + (value & 0xFF)
+
+def _byteEncoding(text):
+  return 'iso-8859-1' if all(ord(character) < 256 for character in text) else 'utf-8'
+
+def _cheapestSegments(text, version, encoding):
+  # Costs are in sixths of a bit, so 3 numeric and 2 alphanumeric characters cost a whole number of bits
+  index = characterCountIndicatorIndex(version)
+  headerCosts = [(len(mIs[mode]) + cCIs[mode][index])*6 for mode in modes]
+  impossible = float('inf')
+  # Decoders read kanji after a UTF-8 ECI header with the wrong character set, so kanji mode is only used without it
+  kanji = encoding != 'utf-8'
+
+  # costs[m] is the cost of the characters so far when the last one is encoded in mode m
+  costs = headerCosts
+  previousModes = []
+  for character in text:
+    try:
+      byteCost = 48*len(character.encode(encoding))
+    except UnicodeEncodeError:
+      byteCost = impossible
+    characterCosts = (
+      20 if '0' <= character <= '9' else impossible,
+      33 if character in aVs else impossible,
+      byteCost,
+      78 if kanji and _kanjiValue(character) is not None else impossible
+    )
+    if previousModes:
+      # Ending the cheapest segment here and starting a new one
+      cheapest = min(range(len(modes)), key=lambda mode: costs[mode])
+      switchCost = -(-costs[cheapest]//6)*6
+      nextCosts = []
+      choices = []
+      for mode in range(len(modes)):
+        if costs[mode] <= switchCost + headerCosts[mode]:
+          nextCosts.append(costs[mode] + characterCosts[mode])
+          choices.append(mode)
+        else:
+          nextCosts.append(switchCost + headerCosts[mode] + characterCosts[mode])
+          choices.append(cheapest)
+      costs = nextCosts
+    else:
+      costs = [headerCosts[mode] + characterCosts[mode] for mode in range(len(modes))]
+      choices = [None]*len(modes)
+    previousModes.append(choices)
+
+  # Walk back through the choices to find the mode of each character
+  segments = []
+  mode = min(range(len(modes)), key=lambda mode: costs[mode]) if text else None
+  end = len(text)
+  for position in range(len(text) - 1, -1, -1):
+    previousMode = previousModes[position][mode]
+    if previousMode != mode:
+      segments.append((modes[mode], text[position:end]))
+      end = position
+      mode = previousMode
+  segments.reverse()
+  return segments
+
+def optimalSegments(text, version):
+  """ Segments (mode, text) of the text with the smallest number of bits for the character count indicators of the version """
+  if text.isdecimal() and text.isascii():
+    return [('numeric', text)]
+
+  # Byte mode is ISO-8859-1 unless the text has other characters, then it is UTF-8 after an ECI header
+  encoding = _byteEncoding(text)
+  withoutECI = None
+  if encoding == 'utf-8' and all(character.isascii() or _kanjiValue(character) is not None for character in text):
+    # Kanji mode can avoid the ECI header, the UTF-8 segments are only searched if they could have fewer bits
+    withoutECI = _cheapestSegments(text, version, 'ascii')
+    if segmentsLength(withoutECI, version) <= _utf8LowerBound(text):
+      return withoutECI
+  segments = _cheapestSegments(text, version, encoding)
+  if encoding == 'utf-8' and any(mode == 'byte' and not text.isascii() for mode, text in segments):
+    segments.insert(0, ('eci', utf8Assignment))
+    if withoutECI is not None and segmentsLength(withoutECI, version) <= segmentsLength(segments, version):
+      segments = withoutECI
+  return segments
+
+def _utf8LowerBound(text):
+  # Fewer bits than any segments of the text after a UTF-8 ECI header, every character in its cheapest mode
+  bits = len(mIs['eci']) + 8 + 4
+  for character in text:
+    if '0' <= character <= '9':
+      bits += 10/3
+    elif character in _alphanumericCharacters:
+      bits += 5.5
+    else:
+      bits += 8*len(character.encode('utf-8'))
+  return bits
+
+def segmentsLength(segments, version):
+  """ Number of bits of the segments with their mode and character count indicators """
+  index = characterCountIndicatorIndex(version)
+  encoding = 'utf-8' if any(mode == 'eci' for mode, text in segments) else 'iso-8859-1'
+  length = 0
+  for mode, text in segments:
+    if mode == 'eci':
+      length += len(mIs[mode]) + 8
+      continue
+    length += len(mIs[mode]) + cCIs[mode][index]
+    if mode == 'numeric':
+      length += 10*(len(text)//3) + (0, 4, 7)[len(text)%3]
+    elif mode == 'alphanumeric':
+      length += 11*(len(text)//2) + 6*(len(text)%2)
+    elif mode == 'byte':
+      length += 8*len(text.encode(encoding))
+    else:
+      length += 13*len(text)
+  return length
+
+def encodeSegments(segments, version, bitBuffer):
+  """ Add the mode indicator, character count indicator and data of every segment to the bit buffer """
+  index = characterCountIndicatorIndex(version)
+  encoding = 'utf-8' if any(mode == 'eci' for mode, text in segments) else 'iso-8859-1'
+  for mode, text in segments:
+    bitBuffer.append(int(mIs[mode], 2), len(mIs[mode]))
+    if mode == 'eci':
+      bitBuffer.append(text, 8)
+      continue
+
+    data = text.encode(encoding) if mode == 'byte' else text
+    bitBuffer.append(len(data), cCIs[mode][index])
+    if mode == 'numeric':
+      binaryBits = (4, 7, 10)
+      for digits in range(0, len(text), 3):
+        group = text[digits:digits + 3]
+        bitBuffer.append(int(group), binaryBits[len(group)-1])
+    elif mode == 'alphanumeric':
+      binaryBits = (6, 11)
+      for digits in range(0, len(text), 2):
+        pair = text[digits:digits + 2]
+        group = (45*aVs.index(pair[0])) + aVs.index(pair[1]) if len(pair) == 2 else aVs.index(pair[0])
+        bitBuffer.append(group, binaryBits[len(pair)-1])
+    elif mode == 'byte':
+      bitBuffer.extend(data)
+    else:
+      for character in text:
+        bitBuffer.append(_kanjiValue(character), 13)
+
+def segmentsBytes(segments):
+  """ Bytes of the input data of the segments: numeric and alphanumeric characters in ASCII, byte segments in
+  ISO-8859-1 or in UTF-8 after an ECI header and kanji in Shift JIS """
+  encoding = 'utf-8' if any(mode == 'eci' for mode, text in segments) else 'iso-8859-1'
+  data = bytearray()
+  for mode, text in segments:
+    if mode == 'byte':
+      data += text.encode(encoding)
+    elif mode == 'kanji':
+      data += text.encode('shift_jis')
+    elif mode != 'eci':
+      data += text.encode('ascii')
+  return bytes(data)
@@ -0,0 +1,71 @@
+from dataTables import errorCorrectionCodeWordsBlockInformation as eCCWBI
+from segmentation import optimalSegments, segmentsLength, segmentsBytes
+from versionSelection import selectVersion
+from QRCode import QRCode
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+import os
+import numpy as np
+
+# Bits of the structured append header: mode indicator, symbol position, total symbols and parity
+headerBits = 20
+maxSymbols = 16
+
+def _partSegments(part, maxVersion):
+  # Segments of the part in the version QRCode selects for its symbol
+  version, errorCorretionLevel = selectVersion(
+    lambda version: segmentsLength(optimalSegments(part, version), version) + headerBits, maxVersion=maxVersion
+  )
+  return optimalSegments(part, version)
+
+def parity(parts, maxVersion=10):
+  """ XOR of all the bytes the symbols of the parts encode, see segmentation.segmentsBytes """
+  return reduce(lambda x, y: x ^ y, b''.join(segmentsBytes(_partSegments(part, maxVersion)) for part in parts), 0)
+
+def _fits(text, maxVersion):
+  return segmentsLength(optimalSegments(text, maxVersion), maxVersion) + headerBits <= eCCWBI['L'][maxVersion-1][0]*8
+
+def splitText(text, maxVersion=10):
+  """ Split the text into the fewest parts of about the same length that each fit in a symbol of at most maxVersion """
+  if not text:
+    return [text]
+  capacity = eCCWBI['L'][maxVersion-1][0]*8 - headerBits
+  symbols = max(1, -(-segmentsLength(optimalSegments(text, maxVersion), maxVersion)//capacity))
+  while symbols <= min(maxSymbols, len(text)):
+    partLength = -(-len(text)//symbols)
+    parts = [text[i:i + partLength] for i in range(0, len(text), partLength)]
+    if all(_fits(part, maxVersion) for part in parts):
+      return parts
+    symbols += 1
+  raise ValueError('text does not fit in %d symbols of version %d' % (maxSymbols, maxVersion))
+
+def _createSymbol(part, position, total, textParity, mask, maxVersion):
+  qrCode = QRCode(part, mask=mask, structuredAppend=(position, total, textParity), maxVersion=maxVersion)
+  qrCode.create()
+  return qrCode
+
+def structuredAppendCodes(text, maxVersion=10, workers=None, mask=None):
+  """ Created QR codes of the text split over up to 16 symbols of at most maxVersion, generated in parallel """
+  parts = splitText(text, maxVersion)
+  arguments = (
+    parts, range(len(parts)), [len(parts)]*len(parts), [parity(parts, maxVersion)]*len(parts), [mask]*len(parts),
+    [maxVersion]*len(parts)
+  )
+  workers = min(workers or os.cpu_count(), len(parts))
+  if workers == 1:
+    return list(map(_createSymbol, *arguments))
+  with ProcessPoolExecutor(workers) as executor:
+    return list(executor.map(_createSymbol, *arguments))
+
+def tile(qrCodes, columns=None, spacing=4):
+  """ Matrix with the QR codes side by side in rows, with spacing light modules between them. It can be rendered with
+  imageFormats.encodeImage """
+  columns = columns or len(qrCodes)
+  cellSize = max(qrCode.size for qrCode in qrCodes) + spacing
+  rows = -(-len(qrCodes)//columns)
+  matrix = np.zeros((rows*cellSize - spacing, columns*cellSize - spacing), dtype=np.uint8)
+  for position, qrCode in enumerate(qrCodes):
+    top, left = (position//columns)*cellSize, (position%columns)*cellSize
+    matrix[top:top + qrCode.size, left:left + qrCode.size] = qrCode.matrix
+  return matrix
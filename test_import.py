@@ -0,0 +1,19 @@
+import json
+import os
+import subprocess
+import sys
+
+# Importing QRCode only needs numpy, the rest is imported when show, save or the command line tools use it
+lazyModules = ('cv2', 'tkinter', 'more_itertools')
+maxImportSeconds = 1.0
+
+def test_import():
+  command = (
+    'import sys, time, json; start = time.perf_counter(); import QRCode; seconds = time.perf_counter() - start; '
+    'print(json.dumps({"seconds": seconds, "modules": [name for name in %r if name in sys.modules]}))' % (lazyModules,)
+  )
+  output = subprocess.check_output([sys.executable, '-c', command], cwd=os.path.dirname(os.path.abspath(__file__)))
+  result = json.loads(output)
+  print('import QRCode took %.1f ms' % (result['seconds']*1000))
+  assert result['modules'] == []
+  assert result['seconds'] < maxImportSeconds
@@ -0,0 +1,195 @@
+from dataTables import alphanumericValues as aVs
+from dataTables import errorCorretionLevels as eCLs
+from dataTables import errorCorrectionCodeWordsBlockInformation as eCCWBI
+from dataTables import modeIndicators as mIs
+from dataTables import characterCountIndicators as cCIs
+from galoisField import syndromes
+from codewordBlocks import blockLayout, interleavingOrder
+from segmentation import characterCountIndicatorIndex, utf8Assignment
+from matrixTemplates import functionPatternTemplate, maskPatterns
+from matrixTemplates import formatInformationCoordinates, versionInformationCoordinates
+from matrixTemplates import formatInformationBits, versionInformationBits
+
+from functools import lru_cache
+import numpy as np
+
+# Character sets of the Extended Channel Interpretation assignments the decoder understands
+eciEncodings = {3: 'iso-8859-1', 20: 'shift_jis', utf8Assignment: 'utf-8'}
+
+@lru_cache(maxsize=None)
+def _fixedModules(version):
+  # Function pattern modules that are the same in every QR code of the version
+  template, functionPatterns, rows, columns = functionPatternTemplate(version)
+  fixed = functionPatterns.copy()
+  fixed[formatInformationCoordinates(version)] = False
+  if version >= 7:
+    fixed[versionInformationCoordinates(version)] = False
+  fixed.flags.writeable = False
+  return fixed
+
+@lru_cache(maxsize=None)
+def _formatInformationCandidates():
+  # Both copies of the format information of every error correction level and mask, in the order of eCLs and masks
+  return np.array([formatInformationBits(level, mask) for level in eCLs for mask in range(8)])
+
+def _decodeSegments(dataCodewords, version):
+  # Text and structured append header of the data codewords, raises ValueError if they do not follow the standard
+  bits = format(int.from_bytes(dataCodewords, 'big'), '0%db' % (len(dataCodewords)*8))
+  index = characterCountIndicatorIndex(version)
+  modes = {indicator: mode for mode, indicator in mIs.items()}
+  position = 0
+
+  def read(length):
+    nonlocal position
+    if position + length > len(bits):
+      raise ValueError('segment runs past the data codewords')
+    position += length
+    return int(bits[position - length:position], 2)
+
+  text = []
+  pendingBytes = bytearray()
+  encoding = 'iso-8859-1'
+  structuredAppend = None
+  while len(bits) - position >= 4:
+    mode = modes.get(bits[position:position + 4])
+    position += 4
+    if mode is None:
+      if bits[position - 4:position] == '0000':
+        break
+      raise ValueError('unknown mode indicator ' + bits[position - 4:position])
+
+    # Byte segments are decoded together so a character can not be split between them
+    if mode != 'byte' and pendingBytes:
+      text.append(pendingBytes.decode(encoding))
+      pendingBytes = bytearray()
+
+    if mode == 'structuredAppend':
+      structuredAppend = (read(4), read(4) + 1, read(8))
+    elif mode == 'eci':
+      assignment = read(8)
+      if assignment & 0xC0 == 0x80:
+        assignment = (assignment & 0x3F) << 8 | read(8)
+      elif assignment & 0xE0 == 0xC0:
+        assignment = (assignment & 0x1F) << 16 | read(16)
+      if assignment not in eciEncodings:
+        raise ValueError('unsupported ECI assignment %d' % assignment)
+      encoding = eciEncodings[assignment]
+    else:
+      count = read(cCIs[mode][index])
+      if mode == 'numeric':
+        for digits in range(0, count, 3):
+          digits = min(3, count - digits)
+          value = read((4, 7, 10)[digits - 1])
+          if value >= 10**digits:
+            raise ValueError('numeric value %d has more than %d digits' % (value, digits))
+          text.append('%0*d' % (digits, value))
+      elif mode == 'alphanumeric':
+        for pair in range(count//2):
+          value = read(11)
+          if value >= 45*45:
+            raise ValueError('alphanumeric value %d is too large' % value)
+          text.append(aVs[value//45] + aVs[value%45])
+        if count%2:
+          value = read(6)
+          if value >= 45:
+            raise ValueError('alphanumeric value %d is too large' % value)
+          text.append(aVs[value])
+      elif mode == 'byte':
+        pendingBytes += bytes(read(8) for _ in range(count))
+      else:
+        characters = bytearray()
+        for _ in range(count):
+          value = read(13)
+          value = (value//0xC0) << 8 | value%0xC0
+          characters += (value + (0x8140 if value < 0x1F00 else 0xC140)).to_bytes(2, 'big')
+        text.append(characters.decode('shift_jis'))
+  if pendingBytes:
+    text.append(pendingBytes.decode(encoding))
+
+  # The rest of the codeword is zero and the codewords left are the pad bytes
+  boundary = -(-position//8)*8
+  if '1' in bits[position:boundary]:
+    raise ValueError('bits after the terminator are not zero')
+  padBytes = len(dataCodewords) - boundary//8
+  if bytes(dataCodewords[boundary//8:]) != (b'\xec\x11'*(padBytes//2 + 1))[:padBytes]:
+    raise ValueError('pad bytes are not 0xEC 0x11')
+  return ''.join(text), structuredAppend
+
+def decodeBatch(matrices):
+  """ Decode a stack of module matrices of the same version. Every check up to the Reed-Solomon syndromes runs once for
+  the whole stack, the results are dictionaries with the text, the information read and the first error found """
+  matrices = np.asarray(matrices, dtype=np.uint8)
+  size = matrices.shape[-1]
+  version = (size - 21)//4 + 1
+  if matrices.ndim != 3 or matrices.shape[1] != size or (size - 21)%4 or not 1 <= version <= 40:
+    raise ValueError('matrices must have the shape (count, size, size) of a qr code version')
+  errors = [None]*len(matrices)
+
+  def fail(codes, error):
+    for code in codes:
+      errors[code] = errors[code] or error
+
+  # Function patterns, format information and version information
+  template, functionPatterns, rows, columns = functionPatternTemplate(version)
+  fixed = _fixedModules(version)
+  fail(np.flatnonzero((matrices[:, fixed] != template[fixed]).any(axis=1)), 'function patterns do not match the version')
+  formatRows, formatColumns = formatInformationCoordinates(version)
+  matches = (matrices[:, None, formatRows, formatColumns] == _formatInformationCandidates()).all(axis=2)
+  fail(np.flatnonzero(~matches.any(axis=1)), 'format information is not valid')
+  levels, masks = np.divmod(matches.argmax(axis=1), 8)
+  if version >= 7:
+    versionRows, versionColumns = versionInformationCoordinates(version)
+    fail(np.flatnonzero((matrices[:, versionRows, versionColumns] != versionInformationBits(version)).any(axis=1)),
+      'version information does not match the size')
+
+  # The data modules are unmasked and read in placement order, the remainder bits after the codewords are zero
+  modules = matrices[:, rows, columns] ^ maskPatterns(version)[:, rows, columns][masks]
+  codewordBits = len(interleavingOrder(version, 'L'))*8
+  fail(np.flatnonzero(modules[:, codewordBits:].any(axis=1)), 'remainder bits are not zero')
+
+  # De-interleave the codewords and check the syndromes of every block of every code at once
+  dataCodewords = [None]*len(matrices)
+  for levelIndex, level in enumerate(eCLs):
+    codes = np.flatnonzero(levels == levelIndex)
+    if not len(codes):
+      continue
+    blocksInformation = eCCWBI[level][version-1]
+    order = interleavingOrder(version, level)
+    messages = np.empty((len(codes), len(order)), dtype=np.uint8)
+    messages[:, order] = np.packbits(modules[codes, :codewordBits], axis=1)
+    layout = blockLayout(version, level)
+    blocks = np.append(messages[:, :blocksInformation[0]], np.zeros((len(codes), 1), dtype=np.uint8), axis=1)[:, layout]
+    errorCorrectionCodewords = messages[:, blocksInformation[0]:].reshape(len(codes), len(layout), -1)
+    blockSyndromes = syndromes(np.concatenate([blocks, errorCorrectionCodewords], axis=2), blocksInformation[1])
+    fail(codes[blockSyndromes.any(axis=(1, 2))], 'reed solomon syndromes are not zero')
+    for code, data in zip(codes, messages[:, :blocksInformation[0]]):
+      dataCodewords[code] = data.tobytes()
+
+  results = []
+  for code in range(len(matrices)):
+    text = structuredAppend = None
+    if errors[code] is None:
+      try:
+        text, structuredAppend = _decodeSegments(dataCodewords[code], version)
+      except ValueError as error:
+        errors[code] = str(error)
+    results.append({
+      'text': text, 'version': version, 'errorCorretionLevel': eCLs[levels[code]], 'mask': int(masks[code]),
+      'structuredAppend': structuredAppend, 'error': errors[code]
+    })
+  return results
+
+def decode(matrix):
+  """ Decode a module matrix, raises ValueError with the first error found """
+  result = decodeBatch([matrix])[0]
+  if result['error'] is not None:
+    raise ValueError(result['error'])
+  return result
+
+def verifyBatch(matrices, texts):
+  """ True for each matrix of the stack that decodes back to its text """
+  return np.array([result['text'] == text for result, text in zip(decodeBatch(matrices), texts)], dtype=bool)
+
+def verify(matrix, text):
+  """ True if the matrix decodes back to the text """
+  return bool(verifyBatch([matrix], [text])[0])
@@ -0,0 +1,47 @@
+from dataTables import errorCorretionLevels as eCLs
+from dataTables import errorCorrectionCodeWordsBlockInformation as eCCWBI
+
+from bisect import bisect_left
+
+policies = ('prefer-smaller', 'prefer-stronger')
+
+# Data bits of every version for each error correction level, they grow with the version and shrink with the level
+dataBits = {level: tuple(blocksInformation[0]*8 for blocksInformation in eCCWBI[level]) for level in eCLs}
+
+# Versions that share the sizes of the character count indicators, so a text has the same number of bits in all of them
+versionGroups = ((1, 9), (10, 26), (27, 40))
+
+def smallestVersion(bitsFor, errorCorretionLevel, firstVersion=1, lastVersion=40):
+  """ Smallest version from firstVersion to lastVersion with room for bitsFor(version) bits at the error correction
+  level, None if there is none. bitsFor is called once per group of versions at most """
+  for first, last in versionGroups:
+    first, last = max(first, firstVersion), min(last, lastVersion)
+    if first > last:
+      continue
+    version = bisect_left(dataBits[errorCorretionLevel], bitsFor(first), first - 1, last) + 1
+    if version <= last:
+      return version
+  return None
+
+def selectVersion(bitsFor, errorCorretionLevel=None, version=None, maxVersion=40, policy='prefer-smaller'):
+  """ (version, error correction level) of a QR code for a text of bitsFor(version) bits, None if it does not fit.
+  Only levels from errorCorretionLevel up are used and only versions up to maxVersion, or the version if it is given.
+  prefer-smaller takes the smallest version and then the highest level that fits in it, prefer-stronger takes the
+  highest level and then the smallest version """
+  if policy not in policies:
+    raise ValueError('policy must be one of ' + ', '.join(policies))
+  levels = eCLs[eCLs.index(errorCorretionLevel or 'L'):]
+  firstVersion, lastVersion = (version, version) if version is not None else (1, maxVersion)
+
+  if policy == 'prefer-stronger':
+    for level in reversed(levels):
+      chosenVersion = smallestVersion(bitsFor, level, firstVersion, lastVersion)
+      if chosenVersion is not None:
+        return chosenVersion, level
+    return None
+
+  chosenVersion = smallestVersion(bitsFor, levels[0], firstVersion, lastVersion)
+  if chosenVersion is None:
+    return None
+  bits = bitsFor(chosenVersion)
+  return chosenVersion, next(level for level in reversed(levels) if dataBits[level][chosenVersion-1] >= bits)